@@ -10,23 +10,18 @@ This app:
 - Generates a cinematic mood poster
 """
 
+import hashlib
 import io
+from typing import TYPE_CHECKING
 
-from PIL import Image
-import pandas as pd
-import requests
 import streamlit as st
 
-from movie_api import fetch_movie
-from emotion_model import (
-    load_vader,
-    analyze_emotions_global,
-    analyze_emotion_curve,
-    cosine_similarity,
-)
-from poster_engine import generate_mood_poster
-from film_color_science import EMOTION_DESCRIPTIONS
-from utils import emotion_dict_to_df
+if TYPE_CHECKING:
+    from PIL import Image
+
+# pandas, PIL, requests, nltk and the modules built on them are imported
+# where they're first used. That only speeds up the first cold run: once a
+# movie has been analyzed they stay in sys.modules for every later rerun.
 
 
 # -----------------------------
@@ -40,14 +35,37 @@ st.set_page_config(
 
 
 # -----------------------------
-# Load VADER (cached by Streamlit)
+# Official poster download (cached by Streamlit)
+# -----------------------------
+@st.cache_data(ttl=24 * 60 * 60, show_spinner=False)
+def _fetch_poster_bytes(url: str) -> bytes:
+    import requests
+
+    resp = requests.get(url, timeout=10)
+    # raise on 4xx/5xx so error pages are never cached as poster bytes
+    resp.raise_for_status()
+    return resp.content
+
+
+# -----------------------------
+# Mood poster encoding for download (cached by Streamlit)
 # -----------------------------
-@st.cache_resource
-def get_vader():
-    return load_vader()
+# format label → (PIL format, save options, file extension, MIME type)
+DOWNLOAD_FORMATS = {
+    # lossy q=90 is visually identical for a grainy poster and several times smaller
+    "WebP": ("WEBP", {"quality": 90, "method": 4}, "webp", "image/webp"),
+    # zlib level 1 is much faster than PIL's default 6
+    "PNG": ("PNG", {"optimize": False, "compress_level": 1}, "png", "image/png"),
+}
 
 
-sia = get_vader()
+@st.cache_data(show_spinner=False, max_entries=32)
+def _poster_bytes(img_hash: str, fmt: str, _img: "Image.Image") -> bytes:
+    # keyed on (img_hash, fmt) only; the image itself isn't hashed
+    pil_format, options, _, _ = DOWNLOAD_FORMATS[fmt]
+    buf = io.BytesIO()
+    _img.save(buf, pil_format, **options)
+    return buf.getvalue()
 
 
 # -----------------------------
@@ -66,6 +84,7 @@ grain_strength = st.sidebar.slider("Film Grain", 0.0, 1.0, 0.35, 0.05)
 vignette_strength = st.sidebar.slider("Vignette Strength", 0.0, 1.0, 0.75, 0.05)
 glow_radius = st.sidebar.slider("Soft Glow Radius", 0, 30, 12, 1)
 glow_alpha = st.sidebar.slider("Soft Glow Intensity", 0.0, 1.0, 0.35, 0.05)
+download_format = st.sidebar.selectbox("Poster Download Format", list(DOWNLOAD_FORMATS))
 
 st.sidebar.markdown("---")
 st.sidebar.caption("Film Mood Atlas – explore movies through emotional landscapes.")
@@ -98,6 +117,14 @@ if analyze_button:
         st.warning("Please enter a movie title first.")
         st.stop()
 
+    from movie_api import fetch_movie
+    from emotion_model import (
+        analyze_emotions_global_cached,
+        analyze_emotion_curve_cached,
+        cosine_similarity,
+    )
+    from utils import emotion_dict_to_df
+
     # -------------------------------------------------
     # 1. Fetch movie data
     # -------------------------------------------------
@@ -128,9 +155,11 @@ if analyze_button:
 
     with poster_col:
         if movie["poster"] and movie["poster"] != "N/A":
+            from PIL import Image
+
             try:
-                resp = requests.get(movie["poster"], timeout=10)
-                poster_img = Image.open(io.BytesIO(resp.content))
+                poster_bytes = _fetch_poster_bytes(movie["poster"])
+                poster_img = Image.open(io.BytesIO(poster_bytes))
                 st.image(poster_img, caption="Official Poster", use_column_width=True)
             except Exception:
                 st.info("Poster image could not be loaded.")
@@ -144,10 +173,10 @@ if analyze_button:
     # -------------------------------------------------
     # 2. Emotion analysis (global + curve)
     # -------------------------------------------------
-    global_emotions = analyze_emotions_global(movie["plot"], sia)
+    global_emotions = analyze_emotions_global_cached(movie["plot"])
     df_global = emotion_dict_to_df(global_emotions)
 
-    df_curve = analyze_emotion_curve(movie["plot"], sia)
+    df_curve = analyze_emotion_curve_cached(movie["plot"])
 
     # -------------------------------------------------
     # 3. Tabs: Overview / Emotion Curve / Compare
@@ -158,6 +187,9 @@ if analyze_button:
 
     # ----------------- Overview ----------------------
     with tab_overview:
+        from film_color_science import EMOTION_DESCRIPTIONS
+        from poster_engine import generate_mood_poster_cached
+
         st.markdown("### Global Emotion Profile")
         st.bar_chart(df_global)
 
@@ -174,22 +206,21 @@ if analyze_button:
         st.markdown("---")
         st.markdown("### Cinematic Mood Poster")
 
-        mood_poster = generate_mood_poster(
+        mood_poster = generate_mood_poster_cached(
             global_emotions,
             size=poster_size,
             grain_strength=grain_strength,
             vignette_strength=vignette_strength,
-    
         )
         st.image(mood_poster, caption="Generated Mood Poster", use_column_width=True)
 
-        buf = io.BytesIO()
-        mood_poster.save(buf, format="PNG")
+        poster_hash = hashlib.md5(mood_poster.tobytes(), usedforsecurity=False).hexdigest()
+        _, _, ext, mime = DOWNLOAD_FORMATS[download_format]
         st.download_button(
-            label="Download Mood Poster (PNG)",
-            data=buf.getvalue(),
-            file_name=f"{movie['title'].replace(' ', '_')}_mood_poster.png",
-            mime="image/png",
+            label=f"Download Mood Poster ({download_format})",
+            data=_poster_bytes(poster_hash, download_format, mood_poster),
+            file_name=f"{movie['title'].replace(' ', '_')}_mood_poster.{ext}",
+            mime=mime,
         )
 
     # ----------------- Emotion Curve -----------------
@@ -241,9 +272,11 @@ if analyze_button:
             compare_button = st.button("Analyze Second Movie")
 
         if compare_button and compare_title:
+            import pandas as pd
+
             try:
                 movie_b = fetch_movie(compare_title, api_key)
-                emo_b = analyze_emotions_global(movie_b["plot"], sia)
+                emo_b = analyze_emotions_global_cached(movie_b["plot"])
                 df_b = emotion_dict_to_df(emo_b)
 
                 st.markdown(f"#### Movie B: {movie_b['title']} ({movie_b['year']})")
@@ -3,26 +3,38 @@
 Sentiment analysis and multi-emotion modeling for Film Mood Atlas.
 """
 
-from typing import Dict, List
+from functools import lru_cache
+import re
+from typing import Dict, List, Tuple
 
 import nltk
 from nltk.sentiment import SentimentIntensityAnalyzer
+import numpy as np
 import pandas as pd
+import streamlit as st
 
 from film_color_science import EMOTION_LIST
 
 
 # -------------------------------
-# VADER loader (cached by caller)
+# VADER loader (cached by Streamlit)
 # -------------------------------
+@st.cache_resource
 def load_vader() -> SentimentIntensityAnalyzer:
-    nltk.download("vader_lexicon")
+    # only hit the nltk downloader when the lexicon isn't on disk yet
+    try:
+        nltk.data.find("sentiment/vader_lexicon.zip")
+    except LookupError:
+        nltk.download("vader_lexicon", quiet=True)
     return SentimentIntensityAnalyzer()
 
 
 # -------------------------------
 # Text segmentation
 # -------------------------------
+_SENT_SPLIT = re.compile(r"[.!?]+")
+
+
 def split_plot_into_segments(text: str, max_chars: int = 280) -> List[str]:
     """
     Roughly split plot text into segments for building an emotion curve.
@@ -31,11 +43,7 @@ def split_plot_into_segments(text: str, max_chars: int = 280) -> List[str]:
     if not text:
         return []
 
-    raw_parts: List[str] = []
-    for part in text.replace("?", ".").replace("!", ".").split("."):
-        p = part.strip()
-        if p:
-            raw_parts.append(p)
+    raw_parts = [p.strip() for p in _SENT_SPLIT.split(text) if p.strip()]
 
     segments: List[str] = []
     current = ""
@@ -58,27 +66,42 @@ def split_plot_into_segments(text: str, max_chars: int = 280) -> List[str]:
 # -------------------------------
 # Sentiment → Emotion Mapping
 # -------------------------------
+# (pos, neg, neu) weights for each emotion
+_SENTIMENT_WEIGHTS: Dict[str, Tuple[float, float, float]] = {
+    "joy":       (0.9,  0.0, 0.0),
+    "hope":      (0.6,  0.0, 0.1),
+    "calm":      (0.0,  0.0, 0.7),
+    "nostalgia": (0.15, 0.0, 0.3),
+    "sadness":   (0.0,  0.7, 0.0),
+    "fear":      (0.0,  0.5, 0.1),
+    "anger":     (0.0,  0.6, 0.0),
+    "tension":   (0.0,  0.4, 0.2),
+}
+
+# (len(EMOTION_LIST), 3) coefficient matrix, rows in EMOTION_LIST order
+_COEFFS = np.array([_SENTIMENT_WEIGHTS[e] for e in EMOTION_LIST])
+
+
 def map_sentiment_to_emotions(pos: float, neg: float, neu: float) -> Dict[str, float]:
     """
     Expand basic VADER positive / negative / neutral scores
     into a richer set of emotions used in our atlas.
     """
-    raw = {
-        "joy":      pos * 0.9,
-        "hope":     pos * 0.6 + neu * 0.1,
-        "calm":     neu * 0.7,
-        "nostalgia": neu * 0.3 + pos * 0.15,
-        "sadness":  neg * 0.7,
-        "fear":     neg * 0.5 + neu * 0.1,
-        "anger":    neg * 0.6,
-        "tension":  neg * 0.4 + neu * 0.2,
-    }
-
-    total = sum(raw.values())
+    raw = _COEFFS @ np.array([pos, neg, neu])
+    total = raw.sum()
     if total == 0:
-        return {k: 0.0 for k in raw}
+        return {e: 0.0 for e in EMOTION_LIST}
 
-    return {k: v / total for k, v in raw.items()}
+    return {e: float(v / total) for e, v in zip(EMOTION_LIST, raw)}
+
+
+@lru_cache(maxsize=4096)
+def _segment_scores(
+    sia: SentimentIntensityAnalyzer, seg: str
+) -> Tuple[float, float, float, float]:
+    """Memoized VADER (compound, pos, neg, neu) for one plot segment."""
+    vs = sia.polarity_scores(seg)
+    return vs["compound"], vs["pos"], vs["neg"], vs["neu"]
 
 
 def analyze_emotions_global(text: str, sia: SentimentIntensityAnalyzer) -> Dict[str, float]:
@@ -100,51 +123,97 @@ def analyze_emotion_curve(text: str, sia: SentimentIntensityAnalyzer) -> pd.Data
         - emo_xxx for each emotion in EMOTION_LIST
     """
     segments = split_plot_into_segments(text)
-    rows = []
+    n = len(segments)
+    if n == 0:
+        return pd.DataFrame()
+
+    # fill preallocated columns instead of building one dict per row
+    comp = np.empty(n)
+    pos = np.empty(n)
+    neg = np.empty(n)
+    neu = np.empty(n)
 
     for idx, seg in enumerate(segments):
-        vs = sia.polarity_scores(seg)
-        emo = map_sentiment_to_emotions(vs["pos"], vs["neg"], vs["neu"])
-        row = {
-            "segment_index": idx,
-            "segment_text": seg,
-            "compound": vs["compound"],
-            "pos": vs["pos"],
-            "neg": vs["neg"],
-            "neu": vs["neu"],
-        }
-        for e in EMOTION_LIST:
-            row[f"emo_{e}"] = emo.get(e, 0.0)
-        rows.append(row)
-
-    if not rows:
-        return pd.DataFrame()
+        comp[idx], pos[idx], neg[idx], neu[idx] = _segment_scores(sia, seg)
+
+    # the mapping is linear, so all segments go through one (n, 3) @ (3, k) product
+    raw = np.stack([pos, neg, neu], axis=1) @ _COEFFS.T
+    totals = raw.sum(axis=1, keepdims=True)
+    emo_arr = np.zeros_like(raw)
+    np.divide(raw, totals, out=emo_arr, where=totals > 0)
 
-    return pd.DataFrame(rows)
+    df = pd.DataFrame({
+        "segment_index": np.arange(n),
+        "segment_text": segments,
+        "compound": comp,
+        "pos": pos,
+        "neg": neg,
+        "neu": neu,
+    })
+    for i, e in enumerate(EMOTION_LIST):
+        df[f"emo_{e}"] = emo_arr[:, i]
+
+    return df
+
+
+# -------------------------------
+# Cached entry points for the app
+# -------------------------------
+@st.cache_data(show_spinner=False)
+def analyze_emotions_global_cached(text: str) -> Dict[str, float]:
+    """Cached `analyze_emotions_global`, keyed on the plot text only."""
+    return analyze_emotions_global(text, load_vader())
+
+
+@st.cache_data(show_spinner=False)
+def analyze_emotion_curve_cached(text: str) -> pd.DataFrame:
+    """Cached `analyze_emotion_curve`, keyed on the plot text only."""
+    return analyze_emotion_curve(text, load_vader())
 
 
 # -------------------------------
 # Emotion Similarity
 # -------------------------------
+def _to_vec(emotions: Dict[str, float]) -> np.ndarray:
+    """Emotion dict → vector in EMOTION_LIST order (missing emotions are 0)."""
+    return np.fromiter(
+        (emotions.get(e, 0.0) for e in EMOTION_LIST),
+        dtype=np.float64,
+        count=len(EMOTION_LIST),
+    )
+
+
 def cosine_similarity(vec1: Dict[str, float], vec2: Dict[str, float]) -> float:
     """
     Simple cosine similarity between two emotion vectors.
     Both vectors are dicts keyed by emotion name.
     """
-    import math
+    v1 = _to_vec(vec1)
+    v2 = _to_vec(vec2)
+    n1 = np.linalg.norm(v1)
+    n2 = np.linalg.norm(v2)
 
-    dot = 0.0
-    norm1 = 0.0
-    norm2 = 0.0
+    if n1 == 0 or n2 == 0:
+        return 0.0
 
-    for emo in EMOTION_LIST:
-        v1 = vec1.get(emo, 0.0)
-        v2 = vec2.get(emo, 0.0)
-        dot += v1 * v2
-        norm1 += v1 * v1
-        norm2 += v2 * v2
+    return float(v1 @ v2 / (n1 * n2))
 
-    if norm1 == 0 or norm2 == 0:
-        return 0.0
 
-    return dot / math.sqrt(norm1 * norm2)
+def cosine_similarity_batch(
+    ref: Dict[str, float], many: List[Dict[str, float]]
+) -> np.ndarray:
+    """
+    Cosine similarity of one emotion vector against many at once.
+    Returns an array aligned with `many`; zero vectors score 0.0.
+    """
+    if not many:
+        return np.zeros(0)
+
+    ref_vec = _to_vec(ref)
+    mat = np.stack([_to_vec(m) for m in many])
+
+    norms = np.linalg.norm(mat, axis=1) * np.linalg.norm(ref_vec)
+    dots = mat @ ref_vec
+    out = np.zeros(len(many))
+    np.divide(dots, norms, out=out, where=norms > 0)
+    return out
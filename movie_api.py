@@ -5,11 +5,15 @@ OMDb API wrapper for Film Mood Atlas.
 
 from typing import Dict
 import requests
+import streamlit as st
 
 
+@st.cache_data(ttl=24 * 60 * 60, show_spinner=False)
 def fetch_movie(title: str, api_key: str) -> Dict[str, str]:
     """
     Fetch detailed movie information from OMDb.
+    Results are cached per (title, api_key) for a day, so reruns
+    of the Streamlit script don't hit the network again.
 
     Raises:
         ValueError: if api_key is missing or movie not found.
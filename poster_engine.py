@@ -5,39 +5,277 @@ Highly distinct outputs for different emotion vectors.
 Each emotion influences geometry, layout, color, and atmosphere.
 """
 
+from functools import lru_cache
+import zlib
+
 import numpy as np
-from PIL import Image, ImageDraw, ImageFilter
-from typing import Dict
+from PIL import Image
+import streamlit as st
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from film_color_science import EMOTION_COLORS, EMOTION_LIST
+
+
+# Shared generator for unseeded renders
+_RNG = np.random.Generator(np.random.SFC64())
+
+# Emotion → geometric shape mapping, plus color and shape tables indexed
+# by each emotion's position in EMOTION_LIST
+_SHAPE_BY_EMOTION = {
+    "joy": "circle",
+    "sadness": "h_bar",
+    "fear": "triangle",
+    "anger": "spike",
+    "calm": "soft_blob",
+    "nostalgia": "grain_patch",
+    "hope": "glow_orb",
+    "tension": "v_bar",
+}
+_EMO_IDX = {e: i for i, e in enumerate(EMOTION_LIST)}
+_EMOTION_SHAPES = [_SHAPE_BY_EMOTION[e] for e in EMOTION_LIST]
+_COLOR_TABLE = np.array([EMOTION_COLORS[e] for e in EMOTION_LIST], dtype=np.uint8)
 
-from film_color_science import EMOTION_COLORS
+# Side of the precomputed grain tile; covers every poster size the app offers
+_NOISE_POOL_SIZE = 1024
+
+
+@lru_cache(maxsize=1)
+def _noise_pool() -> np.ndarray:
+    """Process-wide (N, N, 4) float32 tile of unit Gaussian noise, built on first use."""
+    rng = np.random.Generator(np.random.SFC64(0))
+    return rng.standard_normal((_NOISE_POOL_SIZE, _NOISE_POOL_SIZE, 4), dtype=np.float32)
+
+
+def _grain_noise(
+    shape: Tuple[int, ...],
+    sigma: float,
+    rng: np.random.Generator,
+    dtype: type = np.float32,
+) -> np.ndarray:
+    """
+    Gaussian grain of the given (h, w, channels) shape as `dtype`: a random
+    crop of the shared noise tile, scaled by sigma. Shapes larger than the
+    tile fall back to sampling directly.
+    """
+    height, width, channels = shape
+    pool = _noise_pool()
+    if height > pool.shape[0] or width > pool.shape[1] or channels > pool.shape[2]:
+        unit = rng.standard_normal(shape, dtype=np.float32)
+    else:
+        oy = int(rng.integers(0, pool.shape[0] - height + 1))
+        ox = int(rng.integers(0, pool.shape[1] - width + 1))
+        unit = pool[oy:oy + height, ox:ox + width, :channels]
+
+    # scale only the crop, converting in the same pass (integer dtypes
+    # truncate toward zero)
+    out = np.empty(shape, dtype=dtype)
+    np.multiply(unit, np.float32(sigma), out=out, casting="unsafe")
+    return out
+
+
+@lru_cache(maxsize=16)
+def _radial_mask(height: int, width: int, strength: float) -> np.ndarray:
+    """
+    Vignette weights as a float32 (height, width) array in [0, 1]:
+    1 in the center, falling linearly to 1 - strength at the corners.
+    Cached per (height, width, strength); callers pass strength rounded to
+    two decimals and must not modify the result.
+    """
+    # distance from the center over the half-diagonal: 0 in the middle, 1 at the corners
+    ys, xs = np.ogrid[:height, :width]
+    max_radius = np.hypot(width, height) / 2
+    d = np.sqrt((xs - width / 2) ** 2 + (ys - height / 2) ** 2) / max_radius
+    mask = (1 - np.clip(d, 0, 1) * strength).astype(np.float32)
+    mask.flags.writeable = False
+    return mask
 
 
 def apply_vignette(img: Image.Image, strength: float = 0.5) -> Image.Image:
     """Add a subtle cinematic vignette."""
     width, height = img.size
-    vignette = Image.new("L", (width, height))
-    draw = ImageDraw.Draw(vignette)
+    mask = _radial_mask(height, width, round(strength, 2))
+
+    # float multiply truncated back to uint8, exactly as in _finish;
+    # color bands only (RGB / RGBA -> 3, L / LA -> 1), alpha is left as it was
+    arr = np.array(img)
+    if arr.ndim == 2:
+        return Image.fromarray((arr * mask).astype(np.uint8))
+    color_bands = 3 if arr.shape[2] >= 3 else 1
+    arr[..., :color_bands] = arr[..., :color_bands] * mask[..., None]
+    return Image.fromarray(arr)
 
-    for i in range(max(width, height)):
-        alpha = int(255 * (i / max(width, height)))
-        draw.ellipse(
-            [(width/2 - i, height/2 - i),
-             (width/2 + i, height/2 + i)],
-            fill=alpha,
-        )
 
-    vignette = vignette.point(lambda x: int(x * strength))
+def apply_grain(
+    img: Image.Image,
+    intensity: float = 0.3,
+    rng: Optional[np.random.Generator] = None,
+) -> Image.Image:
+    """Add subtle film-grain noise (luminance only; alpha is left untouched)."""
+    if rng is None:
+        rng = _RNG
 
-    black = Image.new("RGB", (width, height), (0, 0, 0))
-    return Image.composite(img, black, vignette)
+    # saturating integer add: int16 noise on an int16 copy, clipped back to uint8
+    arr = np.asarray(img).astype(np.int16)
+    height, width = arr.shape[:2]
+    noise = _grain_noise((height, width, 1), 28.0 * intensity, rng, dtype=np.int16)
+    if arr.ndim == 2:
+        # single-band images such as mode "L"
+        arr += noise[..., 0]
+    else:
+        # color bands only: RGB / RGBA -> 3, LA -> 1
+        color_bands = 3 if arr.shape[2] >= 3 else 1
+        arr[..., :color_bands] += noise
+    np.clip(arr, 0, 255, out=arr)
+    return Image.fromarray(arr.astype(np.uint8))
 
 
-def apply_grain(img: Image.Image, intensity: float = 0.3) -> Image.Image:
-    """Add subtle film-grain noise."""
-    arr = np.array(img).astype(np.float32)
-    noise = np.random.normal(0, 28 * intensity, arr.shape)
-    arr = np.clip(arr + noise, 0, 255).astype(np.uint8)
-    return Image.fromarray(arr)
+def _finish(
+    canvas: np.ndarray,
+    grain: float,
+    vignette: float,
+    rng: np.random.Generator,
+) -> Image.Image:
+    """
+    Grain + vignette fused over the uint8 RGB canvas, equivalent to
+    apply_grain followed by apply_vignette: int16 saturating luminance grain,
+    then a single multiply by the float32 mask on the way back to uint8.
+    Either step is skipped when its strength is zero.
+    """
+    vignette = round(vignette, 2)
+    if grain <= 0 and vignette <= 0:
+        return Image.fromarray(np.ascontiguousarray(canvas))
+
+    arr = canvas.astype(np.int16)
+    height, width = arr.shape[:2]
+
+    if grain > 0:
+        arr += _grain_noise((height, width, 1), 28.0 * grain, rng, dtype=np.int16)
+        np.clip(arr, 0, 255, out=arr)
+    if vignette > 0:
+        vmask = _radial_mask(height, width, vignette)[..., None]
+        return Image.fromarray((arr * vmask).astype(np.uint8))
+    return Image.fromarray(arr.astype(np.uint8))
+
+
+@lru_cache(maxsize=4)
+def _grain_patch(color: Tuple[int, int, int], size: int) -> np.ndarray:
+    """
+    A (size, size, 4) uint8 patch of (*color, 60) with independent grain on
+    each channel, alpha included, so the patch's coverage is grainy too.
+    Cached for the last few colors and sizes, so repeated nostalgia layers
+    reuse the same grain.
+    """
+    rng = np.random.Generator(np.random.SFC64(size))
+    patch = _grain_noise((size, size, 4), 28.0 * 0.7, rng) + np.array(
+        (*color, 60), dtype=np.float32
+    )
+    np.clip(patch, 0, 255, out=patch)
+    patch = np.rint(patch).astype(np.uint8)
+    patch.flags.writeable = False
+    return patch
+
+
+# -----------------------------
+# NumPy rasterization into the poster canvas
+# -----------------------------
+def _region(
+    canvas: np.ndarray, x0: int, y0: int, x1: int, y1: int
+) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Clip the inclusive box (x0, y0)-(x1, y1) to the canvas.
+    Returns the canvas view and its pixel coordinates (ogrid ys, xs),
+    or None when the box is entirely off-canvas.
+    Works on both the (h, w, 4) RGBA canvas and its packed (h, w) view.
+    """
+    height, width = canvas.shape[:2]
+    x0, y0 = max(x0, 0), max(y0, 0)
+    x1, y1 = min(x1, width - 1), min(y1, height - 1)
+    if x0 > x1 or y0 > y1:
+        return None
+
+    ys, xs = np.ogrid[y0:y1 + 1, x0:x1 + 1]
+    return canvas[y0:y1 + 1, x0:x1 + 1], ys, xs
+
+
+def _paint(
+    region: np.ndarray,
+    color: Sequence[int],
+    alpha: int,
+    mask: Optional[np.ndarray] = None,
+) -> None:
+    """
+    Overwrite covered pixels of a packed canvas view with (*color, alpha),
+    the way ImageDraw fills shapes on an RGBA image.
+    """
+    rgba = np.array((*color, alpha), dtype=np.uint8).view(np.uint32)[0]
+    if mask is None:
+        region.fill(rgba)
+    else:
+        np.copyto(region, rgba, where=mask)
+
+
+def _composite(
+    region: np.ndarray,
+    color: Union[Sequence[int], np.ndarray],
+    alpha: Union[float, np.ndarray],
+) -> None:
+    """
+    Alpha-composite `color` with `alpha` (0..255, scalar or per pixel) over
+    an RGBA canvas view in place, like Image.alpha_composite.
+    """
+    src_a = np.asarray(alpha, dtype=np.float32) * np.float32(1 / 255)
+    if src_a.ndim == 2:
+        src_a = src_a[..., None]
+    dst_a = region[..., 3:] * np.float32(1 / 255)
+    dst_a *= 1 - src_a
+    out_a = src_a + dst_a
+
+    rgb = np.asarray(color, dtype=np.float32) * src_a
+    rgb += region[..., :3] * dst_a
+    np.divide(rgb, out_a, out=rgb, where=out_a > 0)
+
+    region[..., :3] = rgb + 0.5
+    region[..., 3:] = out_a * 255 + 0.5
+
+
+def _fill_disk(canvas, cx, cy, r, color, alpha) -> None:
+    reg = _region(canvas, cx - r, cy - r, cx + r, cy + r)
+    if reg is not None:
+        region, ys, xs = reg
+        _paint(region, color, alpha, (xs - cx) ** 2 + (ys - cy) ** 2 <= r * r)
+
+
+def _fill_rect(canvas, x0, y0, x1, y1, color, alpha) -> None:
+    reg = _region(canvas, x0, y0, x1, y1)
+    if reg is not None:
+        _paint(reg[0], color, alpha)
+
+
+def _fill_triangle(canvas, cx, cy, t, color, alpha) -> None:
+    """Isosceles triangle with apex (cx, cy - t) and base from cx - t to cx + t at cy + t."""
+    reg = _region(canvas, cx - t, cy - t, cx + t, cy + t)
+    if reg is not None:
+        region, ys, xs = reg
+        _paint(region, color, alpha, 2 * np.abs(xs - cx) <= ys - (cy - t))
+
+
+def _draw_line(canvas, x0, y0, x1, y1, color, alpha, width: int = 3) -> None:
+    """Line segment as every pixel within width / 2 of (x0, y0)-(x1, y1)."""
+    half = width / 2
+    pad = int(np.ceil(half))
+    reg = _region(
+        canvas, min(x0, x1) - pad, min(y0, y1) - pad, max(x0, x1) + pad, max(y0, y1) + pad
+    )
+    if reg is None:
+        return
+
+    region, ys, xs = reg
+    dx, dy = x1 - x0, y1 - y0
+    seg_len2 = dx * dx + dy * dy
+    # parameter of the closest point on the segment, clamped to its ends
+    t = 0.0 if seg_len2 == 0 else np.clip(((xs - x0) * dx + (ys - y0) * dy) / seg_len2, 0, 1)
+    dist2 = (xs - x0 - t * dx) ** 2 + (ys - y0 - t * dy) ** 2
+    _paint(region, color, alpha, dist2 <= half * half)
 
 
 def generate_mood_poster(
@@ -45,12 +283,15 @@ def generate_mood_poster(
     size: int = 720,
     grain_strength: float = 0.35,
     vignette_strength: float = 0.55,
+    seed: Optional[int] = None,
 ) -> Image.Image:
     """
     Generate an A24-style cinematic poster.
     The dominant emotion defines the background tone,
     while other emotions generate abstract geometric elements.
+    Passing a seed makes the layout and grain reproducible.
     """
+    rng = _RNG if seed is None else np.random.Generator(np.random.SFC64(seed))
 
     # -----------------------------
     # 1. Background: dominant emotion → gradient tone
@@ -58,117 +299,141 @@ def generate_mood_poster(
     dominant = max(emotions, key=emotions.get)
     base_color = EMOTION_COLORS.get(dominant, (80, 80, 80))
 
-    bg = Image.new("RGB", (size, size), (10, 10, 12))
-    draw_bg = ImageDraw.Draw(bg)
-
-    for y in range(size):
-        t = y / size
-        r = int(base_color[0] * t * 0.4)
-        g = int(base_color[1] * t * 0.4)
-        b = int(base_color[2] * t * 0.4)
-        draw_bg.line([(0, y), (size, y)], fill=(r, g, b))
+    # every shape is rasterized straight into this one RGBA uint8 buffer
+    canvas = np.empty((size, size, 4), np.uint8)
 
-    img = bg.convert("RGBA")
-    draw = ImageDraw.Draw(img, "RGBA")
+    # gradient written straight into the canvas: one (size, 1, 3) column of
+    # row colors, broadcast across the width
+    t = (np.arange(size, dtype=np.float32) / size * 0.4)[:, None, None]
+    canvas[..., :3] = np.array(base_color, dtype=np.float32) * t
+    canvas[..., 3] = 255
+    # the same memory as one uint32 per pixel, so flat fills write a single value
+    packed = canvas.view(np.uint32)[..., 0]
 
     # -----------------------------
-    # 2. Emotion → geometric shape mapping
+    # 2. Emotion → geometric shapes
     # -----------------------------
-    emotion_shapes = {
-        "joy": "circle",
-        "sadness": "h_bar",
-        "fear": "triangle",
-        "anger": "spike",
-        "calm": "soft_blob",
-        "nostalgia": "grain_patch",
-        "hope": "glow_orb",
-        "tension": "v_bar",
-    }
-
-    for emo, val in emotions.items():
+    # all layout randomness drawn up front: one (x, y) center per emotion and
+    # a row of spike angles per emotion (only the anger row is used)
+    centers = rng.integers(int(size * 0.2), int(size * 0.8), size=(len(emotions), 2))
+    spike_angles = rng.random((len(emotions), 14)) * 2 * np.pi
+
+    for i, (emo, val) in enumerate(emotions.items()):
         if val < 0.05:
             continue
 
         intensity = float(val)
-        color = EMOTION_COLORS.get(emo, (200, 200, 200))
-        shape = emotion_shapes[emo]
+        idx = _EMO_IDX[emo]
+        color = _COLOR_TABLE[idx]
+        shape = _EMOTION_SHAPES[idx]
 
-        cx = np.random.randint(int(size * 0.2), int(size * 0.8))
-        cy = np.random.randint(int(size * 0.2), int(size * 0.8))
+        cx, cy = centers[i].tolist()
 
         # ---- Shapes ----
 
         # Joy → glowing circle
         if shape == "circle":
             r = int(size * (0.1 + intensity * 0.3))
-            draw.ellipse(
-                [(cx - r, cy - r), (cx + r, cy + r)],
-                fill=(*color, int(90 + intensity * 120)),
-            )
+            _fill_disk(packed, cx, cy, r, color, int(90 + intensity * 120))
 
         # Tension → vertical bar
         elif shape == "v_bar":
             w = int(size * (0.05 + intensity * 0.12))
             h = int(size * (0.25 + intensity * 0.4))
-            draw.rectangle(
-                [(cx - w, cy - h), (cx + w, cy + h)],
-                fill=(*color, int(70 + intensity * 150)),
-            )
+            _fill_rect(packed, cx - w, cy - h, cx + w, cy + h,
+                       color, int(70 + intensity * 150))
 
         # Sadness → horizontal bar
         elif shape == "h_bar":
             w = int(size * (0.35 + intensity * 0.8))
             h = int(size * (0.05 + intensity * 0.12))
-            draw.rectangle(
-                [(cx - w, cy - h), (cx + w, cy + h)],
-                fill=(*color, int(60 + intensity * 150)),
-            )
+            _fill_rect(packed, cx - w, cy - h, cx + w, cy + h,
+                       color, int(60 + intensity * 150))
 
         # Fear → triangle
         elif shape == "triangle":
             t = int(size * (0.15 + intensity * 0.3))
-            pts = [(cx, cy - t), (cx - t, cy + t), (cx + t, cy + t)]
-            draw.polygon(pts, fill=(*color, int(70 + intensity * 170)))
+            _fill_triangle(packed, cx, cy, t, color, int(70 + intensity * 170))
 
         # Anger → spiky direction lines
         elif shape == "spike":
             L = int(size * (0.15 + intensity * 0.3))
-            for _ in range(14):
-                angle = np.random.rand() * 2 * np.pi
-                px = cx + int(np.cos(angle) * L)
-                py = cy + int(np.sin(angle) * L)
-                draw.line((cx, cy, px, py), fill=(*color, 130), width=3)
+            pxs = cx + (np.cos(spike_angles[i]) * L).astype(int)
+            pys = cy + (np.sin(spike_angles[i]) * L).astype(int)
+            for px, py in zip(pxs.tolist(), pys.tolist()):
+                _draw_line(packed, cx, cy, px, py, color, 130, width=3)
 
         # Calm → soft simple blob
         elif shape == "soft_blob":
             r = int(size * (0.18 + intensity * 0.3))
-            draw.ellipse(
-                [(cx - r, cy - r), (cx + r, cy + r)],
-                fill=(*color, int(50 + intensity * 90)),
-            )
+            _fill_disk(packed, cx, cy, r, color, int(50 + intensity * 90))
 
         # Nostalgia → film-grain patch
         elif shape == "grain_patch":
             patch_size = int(size * 0.45)
-            patch = Image.new("RGBA", (patch_size, patch_size), (*color, 60))
-            patch = apply_grain(patch, 0.7)
-            img.alpha_composite(patch, (cx - patch_size//2, cy - patch_size//2))
+            x0, y0 = cx - patch_size // 2, cy - patch_size // 2
+            reg = _region(canvas, x0, y0, x0 + patch_size - 1, y0 + patch_size - 1)
+            if reg is not None:
+                region, ys, xs = reg
+                patch = _grain_patch(tuple(color.tolist()), patch_size)
+                oy, ox = ys[0, 0] - y0, xs[0, 0] - x0
+                patch = patch[oy:oy + region.shape[0], ox:ox + region.shape[1]]
+                _composite(region, patch[..., :3], patch[..., 3])
 
         # Hope → glowing orb
         elif shape == "glow_orb":
             r = int(size * (0.12 + intensity * 0.35))
-            orb = Image.new("RGBA", (r * 2, r * 2))
-            d = ImageDraw.Draw(orb)
-            for i in range(r, 0, -1):
-                alpha = int(120 * (i / r))
-                d.ellipse([(r - i, r - i), (r + i, r + i)], fill=(*color, alpha))
-            img.alpha_composite(orb, (cx - r, cy - r))
+            reg = _region(canvas, cx - r, cy - r, cx + r - 1, cy + r - 1)
+            if reg is not None:
+                region, ys, xs = reg
+                # radial falloff: alpha 120 in the center, fading to 0 at radius r;
+                # float32 throughout, the offsets only need one small column/row each
+                dx = (xs - cx).astype(np.float32)
+                dy = (ys - cy).astype(np.float32)
+                alpha = np.sqrt(dx * dx + dy * dy)
+                alpha *= np.float32(-120 / r)
+                alpha += np.float32(120)
+                np.clip(alpha, 0, 255, out=alpha)
+                _composite(region, color, alpha.astype(np.uint8))
 
     # -----------------------------
     # 3. Finishing (grain + vignette)
     # -----------------------------
-    final = img.convert("RGB")
-    final = apply_grain(final, grain_strength)
-    final = apply_vignette(final, vignette_strength)
+    return _finish(canvas[..., :3], grain_strength, vignette_strength, rng)
+
+
+def _poster_seed(emo_items: Tuple[Tuple[str, float], ...]) -> int:
+    """Stable seed derived from an emotion vector's (name, value) items."""
+    return zlib.crc32(repr(emo_items).encode("utf-8"))
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _generate_mood_poster_cached(
+    emo_items: Tuple[Tuple[str, float], ...],
+    size: int,
+    grain_strength: float,
+    vignette_strength: float,
+) -> Image.Image:
+    return generate_mood_poster(
+        dict(emo_items),
+        size=size,
+        grain_strength=grain_strength,
+        vignette_strength=vignette_strength,
+        seed=_poster_seed(emo_items),
+    )
 
-    return final
+
+def generate_mood_poster_cached(
+    emotions: Dict[str, float],
+    size: int = 720,
+    grain_strength: float = 0.35,
+    vignette_strength: float = 0.55,
+) -> Image.Image:
+    """
+    Cached `generate_mood_poster` for the Streamlit app.
+    Identical emotion vectors and render settings reuse the same poster.
+    The vector is passed through unchanged (same order, same values), so the
+    result equals generate_mood_poster(emotions, seed=_poster_seed(items)).
+    """
+    emo_items = tuple(emotions.items())
+    return _generate_mood_poster_cached(emo_items, size, grain_strength, vignette_strength)
@@ -4,6 +4,7 @@ Small helper utilities for Film Mood Atlas.
 """
 
 from typing import Dict
+import numpy as np
 import pandas as pd
 
 from film_color_science import EMOTION_LIST
@@ -11,12 +12,19 @@ from film_color_science import EMOTION_LIST
 
 def emotion_dict_to_df(emotions: Dict[str, float]) -> pd.DataFrame:
     """Convert an emotion dict into a tidy DataFrame."""
-    return pd.DataFrame.from_dict(emotions, orient="index", columns=["intensity"])
+    # one (n, 1) block with the dict's keys as the index, in insertion order
+    values = np.fromiter(emotions.values(), dtype=np.float64, count=len(emotions))
+    return pd.DataFrame(values.reshape(-1, 1), index=list(emotions), columns=["intensity"])
 
 
 def normalize_emotion_dict(emotions: Dict[str, float]) -> Dict[str, float]:
-    """Ensure the emotion vector sums to 1.0."""
-    total = sum(emotions.values())
+    """Ensure the emotion vector (in EMOTION_LIST order) sums to 1.0."""
+    values = np.fromiter(
+        (emotions.get(k, 0.0) for k in EMOTION_LIST),
+        dtype=np.float64,
+        count=len(EMOTION_LIST),
+    )
+    total = values.sum()
     if total == 0:
-        return {k: 0.0 for k in EMOTION_LIST}
-    return {k: v / total for k, v in emotions.items()}
+        return dict.fromkeys(EMOTION_LIST, 0.0)
+    return dict(zip(EMOTION_LIST, (values / total).tolist()))